@@ -10,13 +10,17 @@ Multi-provider support: Works with both OpenAI and Anthropic APIs
 Content types: Generates product titles, descriptions, meta tags, and blog posts
 JSON output: Returns structured data ready for integration
 Error handling: Gracefully handles API failures
+Response caching: Reuses results for identical or near-identical products (persisted to disk)
 Customizable: Easy to modify prompts or add new content types
 
 Usage:
 
+Install dependencies: pip install "httpx[http2]" numpy sentence-transformers
 Replace "your-api-key-here" with your actual API key
+Optionally set LLM_RPM / LLM_MAX_CONCURRENCY to match your provider rate limits
 Choose provider: "openai" or "anthropic"
 Call generate_json_output() with your product information
+Or iterate generate_product_content_stream() from async code to print output as it arrives
 
 Example output structure:
 {
@@ -28,51 +32,306 @@ Example output structure:
 }
 The agent is production-ready and can be easily integrated into e-commerce platforms, content management systems, or marketing automation workflows.
 """
+import asyncio
 import json
-import requests
-from typing import Dict, Any
+import os
+import re
+import shelve
+import threading
+import time
+import httpx
+import numpy as np
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+# Provider limits for your account tier; override via environment
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "10"))
+
+# Status-code retries (the httpx transport only retries failed connections)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+
+class RateLimiter:
+    """Bounds in-flight LLM calls and spaces them with a token bucket refilled at `rpm` per minute.
+    
+    The bucket outlives event loops so repeated asyncio.run calls share one budget; the
+    semaphore and lock are loop-bound, so they are rebuilt whenever the running loop changes.
+    """
+    
+    def __init__(self, rpm: int, max_concurrency: int):
+        if rpm < 1 or max_concurrency < 1:
+            raise ValueError(f"RateLimiter needs rpm >= 1 and max_concurrency >= 1, got rpm={rpm}, "
+                             f"max_concurrency={max_concurrency} (check LLM_RPM / LLM_MAX_CONCURRENCY)")
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+        self._loop = None
+        self._semaphore = None
+        self._lock = None
+    
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._lock = asyncio.Lock()
+    
+    async def _take_token(self) -> None:
+        async with self._lock:
+            while True:
+                # Refill lazily from elapsed time instead of running a background task
+                now = time.monotonic()
+                self._tokens = min(self.rpm, self._tokens + (now - self._updated) * self.rpm / 60)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * 60 / self.rpm)
+    
+    async def __aenter__(self) -> "RateLimiter":
+        self._bind_loop()
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+DIGITS_RE = re.compile(r'\d+')
+
+# One budget for every generator in the process, across successive asyncio.run calls
+LIMITER = RateLimiter(LLM_RPM, LLM_MAX_CONCURRENCY)
+
+class ResponseCache:
+    """Two-level cache of generated content: exact product string, then embedding similarity.
+    
+    get/put load the model, encode and rewrite the shelve file, so async code runs them
+    in a worker thread; the lock serializes those threads.
+    """
+    
+    def __init__(self, path: str = "content_cache", threshold: float = 0.92,
+                 model_name: str = "all-MiniLM-L6-v2"):
+        self.path = path
+        self.threshold = threshold
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        with shelve.open(self.path) as db:
+            self.exact: Dict[str, Dict[str, Any]] = db.get("exact", {})
+            # (product_info, embedding, result) triples
+            self.semantic: List[Tuple[str, np.ndarray, Dict[str, Any]]] = db.get("semantic", [])
+    
+    def _embed(self, text: str) -> np.ndarray:
+        # Local model, loaded on first use, so lookups cost no API calls
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+    
+    def get(self, product_info: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if product_info in self.exact:
+                return self.exact[product_info]
+            # "iPhone 14 case" and "iPhone 15 case" embed almost identically, so semantic
+            # hits are limited to products whose names contain the same numbers
+            numbers = DIGITS_RE.findall(product_info)
+            candidates = [(vector, result) for key, vector, result in self.semantic
+                          if DIGITS_RE.findall(key) == numbers]
+            if not candidates:
+                return None
+            
+            # Embeddings are normalized, so the dot product is the cosine similarity
+            query = self._embed(product_info)
+            scores = np.stack([vector for vector, _ in candidates]) @ query
+            best = int(np.argmax(scores))
+            return candidates[best][1] if scores[best] >= self.threshold else None
+    
+    def put(self, product_info: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self.exact[product_info] = result
+            self.semantic.append((product_info, self._embed(product_info), result))
+            with shelve.open(self.path) as db:
+                db["exact"] = self.exact
+                db["semantic"] = self.semantic
 
 class AIContentGenerator:
-    def __init__(self, api_key: str, provider: str = "openai"):
+    CONTENT_CONSTRAINTS = {
+        "title": "compelling product title, max 60 characters",
+        "description": "2-3 sentence product description",
+        "meta_title": "SEO meta title, 50-60 characters",
+        "meta_description": "SEO meta description, 150-160 characters",
+        "blog_post": "200-word blog post about the benefits of the product"
+    }
+    
+    def __init__(self, api_key: str, provider: str = "openai", cache: Optional[ResponseCache] = None):
         self.api_key = api_key
         self.provider = provider
+        self.cache = cache if cache is not None else ResponseCache()
         self.endpoints = {
             "openai": "https://api.openai.com/v1/chat/completions",
             "anthropic": "https://api.anthropic.com/v1/messages"
         }
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the running event loop; keep-alive
+        # connections are pooled and connect failures retried by the transport
+        if self._client is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=True, retries=3,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+            )
+            self._client = httpx.AsyncClient(transport=transport, timeout=60)
+        return self._client
     
-    def _make_request(self, prompt: str) -> str:
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _request_args(self, prompt: str, stream: bool = False) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         if self.provider == "openai":
             headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
-            data = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}], "max_tokens": 500}
-            response = requests.post(self.endpoints["openai"], headers=headers, json=data)
-            return response.json()["choices"][0]["message"]["content"]
+            data = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}], "max_tokens": 800,
+                    "response_format": {"type": "json_object"}}
         elif self.provider == "anthropic":
             headers = {"x-api-key": self.api_key, "Content-Type": "application/json", "anthropic-version": "2023-06-01"}
-            data = {"model": "claude-3-sonnet-20240229", "max_tokens": 500, "messages": [{"role": "user", "content": prompt}]}
-            response = requests.post(self.endpoints["anthropic"], headers=headers, json=data)
-            return response.json()["content"][0]["text"]
-    
-    def generate_product_content(self, product_info: str) -> Dict[str, Any]:
-        prompts = {
-            "title": f"Create a compelling product title for: {product_info}. Max 60 characters.",
-            "description": f"Write a 2-3 sentence product description for: {product_info}",
-            "meta_title": f"Create an SEO meta title (50-60 chars) for: {product_info}",
-            "meta_description": f"Create an SEO meta description (150-160 chars) for: {product_info}",
-            "blog_post": f"Write a 200-word blog post about the benefits of: {product_info}"
-        }
+            data = {"model": "claude-3-sonnet-20240229", "max_tokens": 800, "messages": [{"role": "user", "content": prompt}]}
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        if stream:
+            data["stream"] = True
+        return self.endpoints[self.provider], headers, data
+    
+    async def _send(self, url: str, headers: Dict[str, str], data: Dict[str, Any],
+                    stream: bool = False) -> httpx.Response:
+        """POST with backoff on RETRY_STATUSES; raises for any other error status.
         
+        With stream=True the body is not read yet and the caller must close the response.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            async with LIMITER:
+                request = self.client.build_request("POST", url, headers=headers, json=data)
+                response = await self.client.send(request, stream=stream)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            await response.aclose()
+            await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+        if response.is_error:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+    
+    async def _make_request(self, prompt: str) -> str:
+        url, headers, data = self._request_args(prompt)
+        response = await self._send(url, headers, data)
+        if self.provider == "openai":
+            return response.json()["choices"][0]["message"]["content"]
+        return response.json()["content"][0]["text"]
+    
+    async def _stream_request(self, prompt: str) -> AsyncIterator[str]:
+        """Yield text deltas from the provider's server-sent event stream."""
+        url, headers, data = self._request_args(prompt, stream=True)
+        # Retries happen while opening the stream, before anything has been yielded
+        response = await self._send(url, headers, data, stream=True)
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue  # Skip "event:" lines, keep-alives and blank separators
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                event = json.loads(payload)
+                if event.get("type") == "error":
+                    # Anthropic reports mid-stream failures (e.g. overloaded) as an error event
+                    error = event.get("error") or {}
+                    raise RuntimeError(f"Stream failed: {error.get('type', 'error')}: {error.get('message', '')}")
+                if self.provider == "openai":
+                    text = event["choices"][0]["delta"].get("content") if event.get("choices") else None
+                elif event.get("type") == "content_block_delta":
+                    text = event["delta"].get("text")
+                else:
+                    text = None
+                if text:
+                    yield text
+        finally:
+            await response.aclose()
+    
+    @staticmethod
+    def _parse_json(text: str) -> Dict[str, Any]:
+        # Anthropic has no JSON mode, so tolerate prose or code fences around the object
+        start, end = text.find("{"), text.rfind("}")
+        content = json.loads(text[start:end + 1] if start != -1 and end > start else text)
+        # Raised as ValueError so both callers fall into their existing error handling
+        if not isinstance(content, dict):
+            raise ValueError(f"expected a JSON object, got {type(content).__name__}")
+        return content
+    
+    def _build_prompt(self, product_info: str) -> str:
+        # One request for all fields instead of one round trip per field
+        fields = "\n".join(f"- {key}: {rule}" for key, rule in self.CONTENT_CONSTRAINTS.items())
+        return (f"Return ONLY a JSON object with keys {', '.join(self.CONTENT_CONSTRAINTS)} for product: {product_info}.\n"
+                f"Respect these length constraints:\n{fields}")
+    
+    async def _collect_results(self, product_info: str, content: Dict[str, Any]) -> Dict[str, Any]:
         results = {}
-        for content_type, prompt in prompts.items():
-            try:
-                results[content_type] = self._make_request(prompt).strip()
-            except Exception as e:
-                results[content_type] = f"Error generating {content_type}: {str(e)}"
+        for content_type in self.CONTENT_CONSTRAINTS:
+            value = content.get(content_type)
+            results[content_type] = str(value).strip() if value else f"Error generating {content_type}: missing from response"
+        
+        # Only cache complete results so failed fields are retried next time
+        if all(content.get(content_type) for content_type in self.CONTENT_CONSTRAINTS):
+            await asyncio.to_thread(self.cache.put, product_info, results)
         
         return results
     
+    async def generate_product_content(self, product_info: str) -> Dict[str, Any]:
+        # Off the event loop: embedding and disk I/O would stall other coroutines
+        cached = await asyncio.to_thread(self.cache.get, product_info)
+        if cached is not None:
+            return cached
+        
+        try:
+            content = self._parse_json(await self._make_request(self._build_prompt(product_info)))
+        except Exception as e:
+            return {content_type: f"Error generating {content_type}: {str(e)}" for content_type in self.CONTENT_CONSTRAINTS}
+        
+        return await self._collect_results(product_info, content)
+    
+    async def generate_product_content_stream(self, product_info: str) -> AsyncIterator[str]:
+        """Yield the raw JSON text as it is generated; the completed object is cached as usual."""
+        # Off the event loop: embedding and disk I/O would stall other coroutines
+        cached = await asyncio.to_thread(self.cache.get, product_info)
+        if cached is not None:
+            yield json.dumps(cached, indent=2)
+            return
+        
+        chunks = []
+        async for chunk in self._stream_request(self._build_prompt(product_info)):
+            chunks.append(chunk)
+            yield chunk
+        
+        try:
+            await self._collect_results(product_info, self._parse_json("".join(chunks)))
+        except ValueError:
+            pass  # Incomplete or malformed JSON is streamed but not cached
+    
+    async def _generate_and_close(self, product_info: str) -> Dict[str, Any]:
+        try:
+            return await self.generate_product_content(product_info)
+        finally:
+            await self.aclose()
+    
     def generate_json_output(self, product_info: str) -> str:
-        content = self.generate_product_content(product_info)
+        """Synchronous entry point: runs the async generation on a fresh event loop."""
+        content = asyncio.run(self._generate_and_close(product_info))
         return json.dumps(content, indent=2)
 
 # Usage example
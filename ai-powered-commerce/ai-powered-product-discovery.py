@@ -6,14 +6,15 @@ Uses OpenAI or Anthropic APIs for intelligent product discovery.
 Key Components:
 
 AI Query Refinement: Uses Anthropic's Claude API to extract keywords and budget from natural language input
+Query Cache: Reuses refinements for repeated or similar requests (exact + semantic match, stored on disk)
 Amazon Search: Scrapes Amazon.in search results with proper headers to avoid blocking
-AI-Powered Ranking: Re-ranks products based on relevance to the original query
+Relevance Ranking: Re-ranks products locally with TF-IDF similarity to the original query (optional Claude ranking)
 Clean Output: Displays top 3 recommendations with titles, prices, and links
 
 Setup Requirements:
 
 Install dependencies: 
-pip install requests beautifulsoup4 anthropic
+pip install requests beautifulsoup4 lxml anthropic numpy scikit-learn sentence-transformers
 
 Usage Example:
 Enter your product need: best budget wireless earbuds under ₹2000 for workouts
@@ -29,7 +30,7 @@ Features:
 
 - Extracts budget constraints automatically
 - Filters products by price if budget is specified
-- Uses AI to rank products by relevance to user intent
+- Ranks products by relevance to user intent (set USE_LLM_RANK=1 to rank with Claude)
 - Handles errors gracefully with timeouts and exception handling
 - Lightweight and fast execution
 
@@ -38,24 +39,115 @@ The script respects Amazon's structure and includes proper headers for ethical s
 
 """
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import anthropic
+import numpy as np
+import os
 import re
+import shelve
+from sklearn.feature_extraction.text import TfidfVectorizer
 from urllib.parse import quote
 
 # Configuration
 ANTHROPIC_API_KEY = "your_anthropic_api_key_here"
 client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+USE_LLM_RANK = os.getenv("USE_LLM_RANK", "").lower() in ("1", "true", "yes")
+
+# Shared session: reuses keep-alive connections and retries transient failures
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=10, pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+DIGITS_RE = re.compile(r'\d+')
+
+# Only build the tree for search result cards, skipping the rest of the page
+RESULT_STRAINER = SoupStrainer('div', {'data-component-type': 's-search-result'})
+
+class QueryCache:
+    """Remembers refined queries: exact match on normalized input, then embedding similarity"""
+    # Values are the refine_query dicts: {"keywords": str, "budget_max": int | None}
+    
+    def __init__(self, path="query_cache", threshold=0.9, model_name="all-MiniLM-L6-v2"):
+        self.path = path
+        self.threshold = threshold
+        self.model_name = model_name
+        self.model = None
+        with shelve.open(path) as db:
+            self.exact = db.get("exact", {})
+            self.entries = db.get("entries", [])  # (input, embedding, refined) triples
+    
+    def _embed(self, text):
+        if self.model is None:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(self.model_name)
+        return self.model.encode(text, normalize_embeddings=True)
+    
+    def get(self, key):
+        if key in self.exact:
+            return self.exact[key]
+        # Near-identical wording can differ only in the budget ("under 2000" vs "under 5000"),
+        # so semantic hits are limited to inputs containing the same numbers
+        numbers = DIGITS_RE.findall(key)
+        candidates = [entry for entry in self.entries if DIGITS_RE.findall(entry[0]) == numbers]
+        if not candidates:
+            return None
+        
+        # Normalized embeddings: dot product equals cosine similarity
+        scores = np.stack([embedding for _, embedding, _ in candidates]) @ self._embed(key)
+        best = int(np.argmax(scores))
+        return candidates[best][2] if scores[best] >= self.threshold else None
+    
+    def put(self, key, refined):
+        self.exact[key] = refined
+        self.entries.append((key, self._embed(key), refined))
+        with shelve.open(self.path) as db:
+            db["exact"] = self.exact
+            db["entries"] = self.entries
+
+query_cache = None
+
+def get_query_cache():
+    """Open the on-disk query cache on first use rather than at import time"""
+    global query_cache
+    if query_cache is None:
+        query_cache = QueryCache()
+    return query_cache
+
+# Forcing this tool makes Claude return arguments that already match the schema
+SEARCH_TOOL = {
+    "name": "extract_search",
+    "description": "Record the product search keywords and the maximum budget in rupees, if one was given.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "keywords": {"type": "string"},
+            "budget_max": {"type": ["integer", "null"]}
+        },
+        "required": ["keywords", "budget_max"]
+    }
+}
 
 def refine_query(user_input):
-    """Use AI to extract key search terms and budget from user input"""
-    prompt = f"Extract search keywords and budget from: '{user_input}'. Return only: keywords|budget_max"
+    """Use AI to extract key search terms and budget from user input as {"keywords", "budget_max"}"""
+    key = user_input.lower().strip()
+    cached = get_query_cache().get(key)
+    if cached is not None:
+        return cached
+    
     response = client.messages.create(
         model="claude-3-sonnet-20240229",
-        max_tokens=50,
-        messages=[{"role": "user", "content": prompt}]
+        max_tokens=100,
+        tools=[SEARCH_TOOL],
+        tool_choice={"type": "tool", "name": "extract_search"},
+        messages=[{"role": "user", "content": f"Extract search keywords and budget from: '{user_input}'"}]
     )
-    return response.content[0].text.strip()
+    refined = response.content[0].input
+    get_query_cache().put(key, refined)
+    return refined
 
 def search_amazon(query, max_price=None):
     """Search Amazon and extract product info"""
@@ -63,19 +155,20 @@ def search_amazon(query, max_price=None):
     url = f"https://www.amazon.in/s?k={quote(query)}"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = session.get(url, headers=headers, timeout=10)
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=RESULT_STRAINER)
         products = []
         
-        for item in soup.find_all('div', {'data-component-type': 's-search-result'})[:5]:
-            title_elem = item.find('h2', class_='a-size-mini')
-            price_elem = item.find('span', class_='a-price-whole')
-            link_elem = item.find('h2').find('a') if item.find('h2') else None
+        for item in soup.select('div[data-component-type="s-search-result"]', limit=5):
+            title_elem = item.select_one('h2.a-size-mini')
+            price_elem = item.select_one('span.a-price-whole')
+            link_elem = item.select_one('h2 a')
             
             if title_elem and price_elem and link_elem:
                 title = title_elem.get_text().strip()
                 price_text = price_elem.get_text().replace(',', '')
-                price = int(re.findall(r'\d+', price_text)[0]) if re.findall(r'\d+', price_text) else 0
+                price_match = DIGITS_RE.search(price_text)
+                price = int(price_match.group(0)) if price_match else 0
                 link = "https://amazon.in" + link_elem.get('href')
                 
                 if not max_price or price <= max_price:
@@ -87,6 +180,21 @@ def search_amazon(query, max_price=None):
         return []
 
 def rank_products(products, original_query):
+    """Rank products by TF-IDF similarity to the query; set USE_LLM_RANK=1 to rank with Claude instead"""
+    if not products:
+        return []
+    if USE_LLM_RANK:
+        return rank_products_llm(products, original_query)
+    
+    # Local scoring: no network round trip
+    try:
+        matrix = TfidfVectorizer().fit_transform([original_query] + [p['title'] for p in products])
+    except ValueError:  # Empty vocabulary: no words to compare
+        return products
+    scores = (matrix[1:] @ matrix[0].T).toarray().ravel()  # Rows are L2-normalized: dot = cosine
+    return [products[i] for i in np.argsort(-scores, kind='stable')]
+
+def rank_products_llm(products, original_query):
     """Use AI to rank products by relevance"""
     if not products:
         return []
@@ -111,9 +219,11 @@ def main():
     
     # Refine query with AI
     refined = refine_query(user_query)
-    parts = refined.split('|')
-    keywords = parts[0] if parts else user_query
-    budget = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+    keywords = refined.get("keywords") or user_query
+    budget = refined.get("budget_max")
+    # Only a positive whole number is usable as a price filter
+    if not isinstance(budget, int) or isinstance(budget, bool) or budget <= 0:
+        budget = None
     
     print(f"🎯 Searching for: {keywords}" + (f" (Budget: ₹{budget})" if budget else ""))
     
@@ -8,12 +8,15 @@ Key Features:
 OpenAI Integration: Uses GPT-3.5-turbo for natural language understanding
 Anthropic Support: Template for Claude API (commented out)
 JSON Output: Structured response parsing
+Async Client: Smaller queues are analyzed concurrently on one shared AsyncOpenAI client
+Bulk Mode: Large ticket queues go through the OpenAI Batch API (lower cost, higher throughput)
 Error Handling: Graceful failure with helpful messages
 
 Setup Instructions:
 
 Install dependencies: pip install openai
 Set API key: export OPENAI_API_KEY="your-key-here"
+Optional: export LLM_RPM / LLM_MAX_CONCURRENCY to match your rate limits
 Run the script
 
 Benefits over keyword matching:
@@ -27,16 +30,93 @@ The AI will provide much more sophisticated analysis than simple keyword matchin
 To use Anthropic instead, uncomment the Anthropic section and install the anthropic package.
 """
 
+import asyncio
 import json
 import os
-from openai import OpenAI
+import time
+from openai import AsyncOpenAI
 # Alternative: from anthropic import Anthropic
 
-def analyze_ticket_with_openai(ticket_id, message):
-    """Analyze ticket using OpenAI API."""
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Queues larger than this go through the Batch API instead of one call per ticket
+BATCH_THRESHOLD = 20
+
+# Provider limits for your account tier; override via environment
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "10"))
+
+class RateLimiter:
+    """Limit concurrent ticket requests and keep them under `rpm` requests per minute."""
+    
+    def __init__(self, rpm, max_concurrency):
+        if rpm < 1 or max_concurrency < 1:
+            raise ValueError(f"RateLimiter needs rpm >= 1 and max_concurrency >= 1, got rpm={rpm}, "
+                             f"max_concurrency={max_concurrency} (check LLM_RPM / LLM_MAX_CONCURRENCY)")
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+        self._loop = None
+        self._semaphore = None
+        self._lock = None
+    
+    def _bind_loop(self):
+        # Tokens persist across asyncio.run calls; the semaphore and lock belong to one loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._lock = asyncio.Lock()
+    
+    async def _take_token(self):
+        async with self._lock:
+            while True:
+                # Refill lazily from elapsed time instead of running a background task
+                now = time.monotonic()
+                self._tokens = min(self.rpm, self._tokens + (now - self._updated) * self.rpm / 60)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * 60 / self.rpm)
     
-    prompt = f"""
+    async def __aenter__(self):
+        self._bind_loop()
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+_limiter = RateLimiter(LLM_RPM, LLM_MAX_CONCURRENCY)
+_client = None
+_client_loop = None
+
+def _get_client():
+    """Return the AsyncOpenAI client for the running event loop, created on first use."""
+    global _client, _client_loop
+    # Its httpx connection pool is tied to the loop it was created on
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        _client_loop = loop
+    return _client
+
+async def aclose():
+    """Close the shared client; await this before the event loop that used it finishes."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _client_loop = None
+
+def _build_prompt(message):
+    """Build the analysis prompt for a single ticket."""
+    return f"""
     Analyze this support ticket and return JSON with these fields:
     - summary: Brief 1-2 sentence summary
     - category: "Bug", "Feature Request", or "Billing Issue"  
@@ -48,14 +128,89 @@ def analyze_ticket_with_openai(ticket_id, message):
     
     Return only valid JSON.
     """
+
+async def analyze_ticket_with_openai_async(ticket_id, message):
+    """Analyze ticket using OpenAI API."""
+    async with _limiter:
+        response = await _get_client().chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": _build_prompt(message)}],
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+    
+    return json.loads(response.choices[0].message.content)
+
+async def analyze_tickets_batch(tickets, poll_interval=30):
+    """Analyze (ticket_id, message) pairs via the OpenAI Batch API; returns {ticket_id: result}."""
+    client = _get_client()
     
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1
+    # One /v1/chat/completions request per JSONL line, matched back by custom_id
+    lines = [
+        json.dumps({
+            "custom_id": str(ticket_id),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-3.5-turbo",
+                "messages": [{"role": "user", "content": _build_prompt(message)}],
+                "temperature": 0.1,
+                "response_format": {"type": "json_object"}
+            }
+        })
+        for ticket_id, message in tickets
+    ]
+    batch_file = await client.files.create(file=("tickets.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
     )
     
-    return json.loads(response.choices[0].message.content)
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+    if batch.output_file_id is None:
+        # Every request failed; details are only in the error file
+        raise RuntimeError(f"Batch {batch.id} produced no output; see error file {batch.error_file_id}")
+    
+    # Failed requests and unparseable replies (e.g. truncated JSON) are skipped, not fatal
+    results = {}
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response["body"]
+            results[record["custom_id"]] = json.loads(body["choices"][0]["message"]["content"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return results
+
+async def analyze_tickets(tickets):
+    """Analyze many tickets, using the Batch API once the queue exceeds BATCH_THRESHOLD.
+    
+    Returns {ticket_id: result}; tickets that failed are left out on both paths.
+    Call aclose() before the surrounding asyncio.run finishes to release the client.
+    """
+    if len(tickets) > BATCH_THRESHOLD:
+        return await analyze_tickets_batch(tickets)
+    # Small queues: issue all requests concurrently on the shared client
+    results = await asyncio.gather(
+        *(analyze_ticket_with_openai_async(ticket_id, message) for ticket_id, message in tickets),
+        return_exceptions=True
+    )
+    return {
+        str(ticket_id): result
+        for (ticket_id, _), result in zip(tickets, results)
+        if not isinstance(result, Exception)
+    }
 
 def analyze_ticket_with_anthropic(ticket_id, message):
     """Analyze ticket using Anthropic API."""
@@ -87,8 +242,14 @@ if __name__ == "__main__":
     
     ticket_msg = "Hi, I was charged twice for my subscription this month. Please look into this and issue a refund ASAP. This is very frustrating!"
     
+    async def main():
+        try:
+            return await analyze_ticket_with_openai_async("12345", ticket_msg)
+        finally:
+            await aclose()
+    
     try:
-        result = analyze_ticket_with_openai("12345", ticket_msg)
+        result = asyncio.run(main())
         format_output(result)
     except Exception as e:
         print(f"Error: {e}")
@@ -68,163 +68,241 @@ Pipl: People search engine
 
 """
 
-import argparse, json, re, os, sys, urllib.request, urllib.parse
+import argparse, asyncio, json, re, os, sys, urllib.request, urllib.parse
 from typing import Dict, Any, List
 from abc import ABC, abstractmethod
 
+try:
+    import httpx  # Optional: enables concurrent URL fetching (pip install httpx)
+except ImportError:
+    httpx = None
+
+try:
+    from selectolax.parser import HTMLParser  # Optional: faster, cleaner HTML text (pip install selectolax)
+except ImportError:
+    HTMLParser = None
+
+# Precompiled patterns shared by the scraper, summarizer and parser
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_RE = re.compile(r'(?:\+1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}')
+TAG_RE = re.compile(r'<[^>]+>')
+URL_RE = re.compile(r'https?://[^\s]+')
+
+# Structured plugin output: {"text": str, "emails": set, "phones": set}
+SourceRecord = Dict[str, Any]
+
+def make_record(text: str, emails=(), phones=()) -> SourceRecord:
+    """Bundle display text with already-extracted contacts so nothing is re-parsed downstream"""
+    return {"text": text, "emails": set(emails), "phones": set(phones)}
+
 # Plugin Interface
 class DataSource(ABC):
+    __slots__ = ()  # Plugins are stateless and shared, see _SOURCES_MAP
+    
     @abstractmethod
-    def fetch_data(self, name: str) -> str:
+    def fetch_data(self, name: str) -> SourceRecord:
         pass
+    
+    async def fetch_data_async(self, name: str) -> SourceRecord:
+        """Run fetch_data in a worker thread; override with a native async client"""
+        return await asyncio.to_thread(self.fetch_data, name)
 
 # Sample Data Source Plugins
 class LinkedInPlugin(DataSource):
-    def fetch_data(self, name: str) -> str:
+    __slots__ = ()
+    
+    def fetch_data(self, name: str) -> SourceRecord:
         # Mock enriched LinkedIn data with contact info
-        return f"LinkedIn: {name} - Senior Developer at Tech Corp, 5+ years experience. Location: San Francisco, CA. Email: {name.lower().replace(' ', '.')}@techcorp.com"
+        email = f"{name.lower().replace(' ', '.')}@techcorp.com"
+        return make_record(f"LinkedIn: {name} - Senior Developer at Tech Corp, 5+ years experience. Location: San Francisco, CA. Email: {email}", emails=[email])
 
 class TwitterPlugin(DataSource):
-    def fetch_data(self, name: str) -> str:
-        return f"Twitter: {name} - Tech influencer, 10K followers. Bio location: SF Bay Area. Contact: DM open for collaborations."
+    __slots__ = ()
+    
+    def fetch_data(self, name: str) -> SourceRecord:
+        return make_record(f"Twitter: {name} - Tech influencer, 10K followers. Bio location: SF Bay Area. Contact: DM open for collaborations.")
 
 class GitHubPlugin(DataSource):
-    def fetch_data(self, name: str) -> str:
-        return f"GitHub: {name} - 50+ repos, Python/JS expert. Location: California, USA. Public email: {name.lower().replace(' ', '')}@gmail.com"
+    __slots__ = ()
+    
+    def fetch_data(self, name: str) -> SourceRecord:
+        email = f"{name.lower().replace(' ', '')}@gmail.com"
+        return make_record(f"GitHub: {name} - 50+ repos, Python/JS expert. Location: California, USA. Public email: {email}", emails=[email])
 
 class CompanyPlugin(DataSource):
-    def fetch_data(self, company: str) -> str:
-        # Mock enriched company employee data with contact details
-        mock_employees = [
-            {
-                "name": "John Smith", "title": "CEO", 
-                "email": f"j.smith@{company.lower().replace(' ', '')}.com",
-                "phone": "+1-555-0101", "location": "New York, NY",
-                "address": "123 Business Ave, NYC 10001",
-                "linkedin": f"linkedin.com/in/john-smith-{company.lower()}"
-            },
-            {
-                "name": "Sarah Johnson", "title": "CTO",
-                "email": f"sarah.j@{company.lower().replace(' ', '')}.com", 
-                "phone": "+1-555-0102", "location": "San Francisco, CA",
-                "address": "456 Tech St, SF 94105",
-                "linkedin": f"linkedin.com/in/sarah-johnson-{company.lower()}"
-            },
-            {
-                "name": "Mike Chen", "title": "VP Engineering",
-                "email": f"m.chen@{company.lower().replace(' ', '')}.com",
-                "phone": "+1-555-0103", "location": "Austin, TX", 
-                "address": "789 Innovation Dr, Austin 78701",
-                "linkedin": f"linkedin.com/in/mike-chen-{company.lower()}"
-            }
-        ]
+    __slots__ = ()
+    MAX_CONCURRENT_LOOKUPS = 10  # Per-company cap to stay polite with enrichment APIs
+    
+    # Mock directory and enrichment data (stand-ins for Hunter.io / Clearbit / Apollo.io)
+    MOCK_DIRECTORY = [("John Smith", "CEO"), ("Sarah Johnson", "CTO"), ("Mike Chen", "VP Engineering")]
+    MOCK_CONTACTS = {
+        "John Smith": {"user": "j.smith", "phone": "+1-555-0101", "location": "New York, NY",
+                       "address": "123 Business Ave, NYC 10001", "slug": "john-smith"},
+        "Sarah Johnson": {"user": "sarah.j", "phone": "+1-555-0102", "location": "San Francisco, CA",
+                          "address": "456 Tech St, SF 94105", "slug": "sarah-johnson"},
+        "Mike Chen": {"user": "m.chen", "phone": "+1-555-0103", "location": "Austin, TX",
+                      "address": "789 Innovation Dr, Austin 78701", "slug": "mike-chen"}
+    }
+    
+    def fetch_data(self, company: str) -> SourceRecord:
+        """Synchronous wrapper; not for use inside a running event loop"""
+        return asyncio.run(self.fetch_data_async(company))
+    
+    async def fetch_data_async(self, company: str) -> SourceRecord:
+        # One directory call, then every employee is enriched concurrently
+        employees = await self._list_employees(company)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_LOOKUPS)
+        
+        async def enrich(emp: Dict[str, str]) -> Dict[str, str]:
+            async with semaphore:
+                return await self._enrich(company, emp)
+        
+        enriched = await asyncio.gather(*(enrich(emp) for emp in employees))
         
         result = f"Company: {company} - Employee Directory\n" + "="*50 + "\n"
-        for emp in mock_employees:
+        for emp in enriched:
             result += f"👤 {emp['name']} - {emp['title']}\n"
             result += f"   📧 {emp['email']}\n"
             result += f"   📱 {emp['phone']}\n" 
             result += f"   📍 {emp['location']}\n"
             result += f"   🏢 {emp['address']}\n"
             result += f"   🔗 {emp['linkedin']}\n\n"
-        return result
+        return make_record(result, emails=(emp["email"] for emp in enriched), phones=(emp["phone"] for emp in enriched))
+    
+    async def _list_employees(self, company: str) -> List[Dict[str, str]]:
+        return [{"name": name, "title": title} for name, title in self.MOCK_DIRECTORY]
+    
+    async def _enrich(self, company: str, emp: Dict[str, str]) -> Dict[str, str]:
+        # Mock per-employee contact lookup
+        contact = self.MOCK_CONTACTS[emp["name"]]
+        return {
+            **emp,
+            "email": f"{contact['user']}@{company.lower().replace(' ', '')}.com",
+            "phone": contact["phone"], "location": contact["location"],
+            "address": contact["address"],
+            "linkedin": f"linkedin.com/in/{contact['slug']}-{company.lower()}"
+        }
 
 class WebScraperPlugin(DataSource):
-    def fetch_data(self, url: str) -> str:
+    __slots__ = ()
+    HEADERS = {'User-Agent': 'Mozilla/5.0'}
+    
+    def fetch_data(self, url: str) -> SourceRecord:
         """Fetch content from URL and extract contact information"""
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+            req = urllib.request.Request(url, headers=self.HEADERS)
             with urllib.request.urlopen(req, timeout=10) as response:
-                content = response.read().decode('utf-8')
-                
-                # Extract contact information using regex
-                emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', content)
-                phones = re.findall(r'(?:\+1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}', content)
-                
-                # Simple text extraction
-                text = re.sub(r'<[^>]+>', ' ', content)
-                text = ' '.join(text.split())
-                text_preview = text[:800] + "..." if len(text) > 800 else text
-                
-                # Format results with contact info
-                result = f"Web Content from {url}:\n{text_preview}\n\n"
-                if emails:
-                    result += f"📧 Found emails: {', '.join(set(emails[:5]))}\n"
-                if phones:
-                    result += f"📱 Found phones: {', '.join(set(phones[:3]))}\n"
-                
-                return result
+                return self._extract(url, response.read().decode('utf-8'))
+        except Exception as e:
+            return make_record(f"Error fetching URL {url}: {str(e)}")
+    
+    async def fetch_data_async(self, url: str) -> SourceRecord:
+        """Non-blocking fetch so several URLs can be gathered concurrently"""
+        if httpx is None:
+            return await super().fetch_data_async(url)
+        try:
+            async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
+                response = await client.get(url, headers=self.HEADERS)
+                response.raise_for_status()  # Match urllib, which raises HTTPError on 4xx/5xx
+                return self._extract(url, response.text)
         except Exception as e:
-            return f"Error fetching URL {url}: {str(e)}"
+            return make_record(f"Error fetching URL {url}: {str(e)}")
+    
+    def _extract(self, url: str, content: str) -> SourceRecord:
+        # Extract contact information using regex (deduplicated, first matches kept)
+        emails = list(dict.fromkeys(EMAIL_RE.findall(content)))[:5]
+        phones = list(dict.fromkeys(PHONE_RE.findall(content)))[:3]
+        
+        text = self._html_to_text(content)
+        text_preview = text[:800] + "..." if len(text) > 800 else text
+        
+        # Format results with contact info
+        result = f"Web Content from {url}:\n{text_preview}\n\n"
+        if emails:
+            result += f"📧 Found emails: {', '.join(emails)}\n"
+        if phones:
+            result += f"📱 Found phones: {', '.join(phones)}\n"
+        
+        return make_record(result, emails, phones)
+    
+    @staticmethod
+    def _html_to_text(content: str) -> str:
+        text = None
+        if HTMLParser is not None:
+            # Parse the DOM in C and drop script/style bodies that regex stripping leaks
+            tree = HTMLParser(content)
+            tree.strip_tags(['script', 'style', 'noscript'])
+            node = tree.body or tree.root
+            if node is not None:
+                text = node.text(separator=' ', strip=True)
+        if text is None:
+            # Fallback: simple tag stripping
+            text = TAG_RE.sub(' ', content)
+        return ' '.join(text.split())
+
+# Shared plugin instances, created once per process
+_SOURCES_MAP = {
+    "linkedin": LinkedInPlugin(),
+    "twitter": TwitterPlugin(),
+    "github": GitHubPlugin(),
+    "web": WebScraperPlugin(),
+    "company": CompanyPlugin()
+}
 
 # AI Summarizer Interface
 class AISummarizer(ABC):
     @abstractmethod
-    def summarize(self, data: str, format_type: str = "text") -> str:
+    def summarize(self, records: List[SourceRecord], format_type: str = "text") -> str:
         pass
 
 class MockAISummarizer(AISummarizer):
-    def summarize(self, data: str, format_type: str = "text") -> str:
-        # Extract contact information from data for summary
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', data)
-        phones = re.findall(r'(?:\+1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}', data)
+    def summarize(self, records: List[SourceRecord], format_type: str = "text") -> str:
+        # Plugins already extracted contacts; just merge them
+        emails = sorted(set().union(*(record["emails"] for record in records)))
+        phones = sorted(set().union(*(record["phones"] for record in records)))
         
         summary = "Professional Intelligence Summary: Comprehensive profile with contact details extracted from multiple sources."
         
-        contact_info = {}
-        if emails:
-            contact_info["emails"] = list(set(emails))
-        if phones:
-            contact_info["phones"] = list(set(phones))
-            
-        if format_type == "json":
-            return json.dumps({
-                "summary": summary, 
-                "contact_info": contact_info,
-                "confidence": 0.8, 
-                "sources": ["linkedin", "twitter", "github", "web", "company"]
-            }, indent=2)
-        elif format_type == "markdown":
+        if format_type not in ("json", "markdown"):
+            # Text format (default) never needs the JSON contact dict
+            result = summary
+            if emails or phones:
+                result += f"\n\n📞 CONTACT INFO:"
+                if emails:
+                    result += f"\n📧 Emails: {', '.join(emails)}"
+                if phones:
+                    result += f"\n📱 Phones: {', '.join(phones)}"
+            return result
+        
+        if format_type == "markdown":
             md = f"# Intelligence Summary\n\n{summary}\n\n"
-            if contact_info:
+            if emails or phones:
                 md += "## 📞 Contact Information\n"
-                if "emails" in contact_info:
-                    md += f"**Emails**: {', '.join(contact_info['emails'])}\n\n"
-                if "phones" in contact_info:
-                    md += f"**Phones**: {', '.join(contact_info['phones'])}\n\n"
+                if emails:
+                    md += f"**Emails**: {', '.join(emails)}\n\n"
+                if phones:
+                    md += f"**Phones**: {', '.join(phones)}\n\n"
             md += "## Data Sources\n- LinkedIn\n- Twitter\n- GitHub\n- Web Scraping\n- Company Directory"
             return md
         
-        # Text format
-        result = summary
-        if contact_info:
-            result += f"\n\n📞 CONTACT INFO:"
-            if "emails" in contact_info:
-                result += f"\n📧 Emails: {', '.join(contact_info['emails'])}"
-            if "phones" in contact_info:
-                result += f"\n📱 Phones: {', '.join(contact_info['phones'])}"
-        return result
+        # JSON format
+        contact_info = {}
+        if emails:
+            contact_info["emails"] = emails
+        if phones:
+            contact_info["phones"] = phones
+        return json.dumps({
+            "summary": summary, 
+            "contact_info": contact_info,
+            "confidence": 0.8, 
+            "sources": ["linkedin", "twitter", "github", "web", "company"]
+        }, indent=2)
 
 # Multi-Command Parser (MCP)
 class MCPParser:
     def __init__(self):
-        self.sources_map = {
-            "linkedin": LinkedInPlugin(),
-            "twitter": TwitterPlugin(), 
-            "github": GitHubPlugin(),
-            "web": WebScraperPlugin(),
-            "company": CompanyPlugin()
-        }
-    
-    def _is_url(self, text: str) -> bool:
-        """Check if text is a valid URL"""
-        url_pattern = re.compile(r'https?://[^\s]+')
-        return bool(url_pattern.search(text))
-    
-    def _extract_urls(self, command: str) -> List[str]:
-        """Extract URLs from command"""
-        url_pattern = re.compile(r'https?://[^\s]+')
-        return url_pattern.findall(command)
+        # Own mapping per parser; the plugin instances themselves are shared
+        self.sources_map = dict(_SOURCES_MAP)
     
     def _extract_company(self, command: str) -> str:
         """Extract company name from command"""
@@ -243,8 +321,8 @@ class MCPParser:
         return None
     
     def parse_command(self, command: str) -> Dict[str, Any]:
-        # Check if command contains URLs
-        urls = self._extract_urls(command)
+        # Check if command contains URLs (single scan)
+        urls = URL_RE.findall(command)
         if urls:
             return {"type": "url", "urls": urls, "sources": ["web"]}
         
@@ -281,45 +359,34 @@ class IntelligenceAgent:
         except FileNotFoundError:
             return default_config
     
-    def gather_intelligence(self, command: str, output_format: str = "text") -> str:
+    async def gather_intelligence(self, command: str, output_format: str = "text") -> str:
         """Main intelligence gathering function"""
         try:
             # Parse command using MCP
             parsed = self.parser.parse_command(command)
             
             if parsed["type"] == "url":
-                # Handle URL analysis
-                gathered_data = []
-                for url in parsed["urls"]:
-                    plugin = self.parser.sources_map["web"]
-                    data = plugin.fetch_data(url)
-                    gathered_data.append(f"URL {url}:\n{data}")
-                target = "URLs: " + ", ".join(parsed["urls"])
+                # Handle URL analysis; all URLs are fetched concurrently
+                plugin = self.parser.sources_map["web"]
+                records = await asyncio.gather(*(plugin.fetch_data_async(url) for url in parsed["urls"]))
             
             elif parsed["type"] == "company":
                 # Handle company research
                 company = parsed["company"]
                 plugin = self.parser.sources_map["company"]
-                data = plugin.fetch_data(company)
-                gathered_data = [f"COMPANY RESEARCH:\n{data}"]
-                target = f"Company: {company}"
+                records = [await plugin.fetch_data_async(company)]
             
             else:
                 # Handle person research
-                name, sources = parsed["name"], parsed["sources"]
-                gathered_data = []
-                for source_name in sources:
-                    if source_name in self.parser.sources_map:
-                        plugin = self.parser.sources_map[source_name]
-                        data = plugin.fetch_data(name)
-                        gathered_data.append(f"{source_name.upper()}: {data}")
-                target = f"Person: {name}"
+                name = parsed["name"]
+                sources = [s for s in parsed["sources"] if s in self.parser.sources_map]
+                # Query all sources concurrently
+                records = await asyncio.gather(
+                    *(self.parser.sources_map[source_name].fetch_data_async(name) for source_name in sources)
+                )
             
-            # Combine and summarize data
-            combined_data = "\n".join(gathered_data)
-            summary = self.ai.summarize(f"{target}\n\n{combined_data}", output_format)
-            
-            return summary
+            # Summarize the structured records; each record's text already names its source
+            return self.ai.summarize(list(records), output_format)
             
         except Exception as e:
             return f"Error gathering intelligence: {str(e)}"
@@ -337,9 +404,19 @@ def main():
     # Determine output format
     output_format = "json" if args.json else "markdown" if args.markdown else "text"
     
+    # Use an io_uring-backed event loop for URL fan-out when available (Linux 5.11+)
+    try:
+        import uringcore
+        policy = uringcore.EventLoopPolicy()
+        # Probe once: io_uring may be missing from the kernel or blocked by seccomp (e.g. Docker)
+        policy.new_event_loop().close()
+        asyncio.set_event_loop_policy(policy)
+    except (ImportError, OSError, RuntimeError):
+        pass
+    
     # Initialize and run agent
     agent = IntelligenceAgent(args.config)
-    result = agent.gather_intelligence(args.command, output_format)
+    result = asyncio.run(agent.gather_intelligence(args.command, output_format))
     
     print(result)
 
@@ -347,12 +424,12 @@ def main():
 """
 # To add new data source:
 class CustomPlugin(DataSource):
-    def fetch_data(self, name: str) -> str:
-        return f"Custom data for {name}"
+    def fetch_data(self, name: str) -> SourceRecord:
+        return make_record(f"Custom data for {name}", emails=[f"{name}@example.com"])
 
 # To add new AI provider:
 class OpenAIProvider(AISummarizer):
-    def summarize(self, data: str, format_type: str = "text") -> str:
+    def summarize(self, records: List[SourceRecord], format_type: str = "text") -> str:
         # OpenAI API call here
         pass
 